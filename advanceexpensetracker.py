@@ -1,40 +1,29 @@
 import sys
-import csv
+import math
 import sqlite3
-import os
-from datetime import datetime
+from datetime import datetime, date
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
     QComboBox, QDateEdit, QMessageBox, QTextEdit, QTabWidget, QTableWidget,
     QTableWidgetItem, QHeaderView, QAbstractItemView, QDialog, QFormLayout,
     QDialogButtonBox, QFileDialog, QVBoxLayout, QGroupBox
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from fpdf import FPDF
 from forex_python.converter import CurrencyRates
-
-# Database setup
-conn = sqlite3.connect('expenses.db')
-c = conn.cursor()
-c.execute('''
-CREATE TABLE IF NOT EXISTS expenses (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    expense_type TEXT,
-    good_or_service TEXT,
-    price REAL,
-    currency TEXT DEFAULT 'USD',
-    date TEXT
+from expensebackend import (
+    DB_PATH, BUDGET_PERIODS, Database, default_categories, default_currencies,
+    search_expenses, fetch_report, fetch_summary, write_csv_report, write_pdf_report,
+    fetch_budget_status, budget_state, budget_alerts,
+    build_parser, run_cli
 )
-''')
-conn.commit()
-
-default_categories = ["FOOD", "HOUSEHOLD", "TRANSPORTATION", "ENTERTAINMENT", "HEALTH", "OTHER"]
 
 class EditExpenseDialog(QDialog):
-    def __init__(self, expense_id, expense_type, good_or_service, price, currency, date_str, categories, parent=None):
+    def __init__(self, db, expense_id, expense_type, good_or_service, price, currency, date_str, categories,
+                 parent=None):
         super().__init__(parent)
+        self.db = db
         self.expense_id = expense_id
         self.categories = categories
         self.setWindowTitle("Edit Expense")
@@ -58,7 +47,7 @@ class EditExpenseDialog(QDialog):
         price_layout = QHBoxLayout()
         self.price_input = QLineEdit(str(price))
         self.currency_combo = QComboBox()
-        self.currency_combo.addItems(["USD", "EUR", "GBP", "JPY", "INR"])
+        self.currency_combo.addItems(default_currencies)
         self.currency_combo.setCurrentText(currency)
         price_layout.addWidget(self.price_input)
         price_layout.addWidget(self.currency_combo)
@@ -94,25 +83,29 @@ class EditExpenseDialog(QDialog):
             QMessageBox.warning(self, "Input Error", "Please enter a valid price.")
             return
 
-        c.execute('''UPDATE expenses SET 
-                  expense_type = ?, 
-                  good_or_service = ?, 
-                  price = ?,
-                  currency = ?,
-                  date = ?
-                  WHERE id = ?''',
-                  (expense_type, good_or_service, price, currency, 
-                   expense_date.strftime('%Y-%m-%d'), self.expense_id))
-        conn.commit()
+        try:
+            self.db.execute('''UPDATE expenses SET 
+                      expense_type = ?, 
+                      good_or_service = ?, 
+                      price = ?,
+                      currency = ?,
+                      date = ?
+                      WHERE id = ?''',
+                      (expense_type, good_or_service, price, currency, 
+                       expense_date.strftime('%Y-%m-%d'), self.expense_id))
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", f"Failed to save expense: {str(e)}")
+            return
         self.accept()
 
 class ExpenseTracker(QWidget):
-    def __init__(self):
+    def __init__(self, db):
         super().__init__()
+        self.db = db
         self.setWindowTitle("Advanced Expense Tracker Pro")
         self.setGeometry(100, 100, 1200, 800)
         self.categories = default_categories.copy()
-        self.currencies = ["USD", "EUR", "GBP", "JPY", "INR"]
+        self.currencies = default_currencies.copy()
         self.currency_rates = CurrencyRates()
         
         # Initialize tabs before UI setup
@@ -120,9 +113,39 @@ class ExpenseTracker(QWidget):
         self.tab_manage_expenses = QWidget()
         self.tab_summary = QWidget()
         self.tab_export = QWidget()
+        self.tab_budgets = QWidget()
         
         self.init_ui()
 
+        # Refresh when another window or process commits to the database
+        self.data_version = self.db.data_version()
+        self.change_timer = QTimer(self)
+        self.change_timer.timeout.connect(self.check_for_external_changes)
+        self.change_timer.start(1000)
+
+    def check_for_external_changes(self):
+        try:
+            version = self.db.data_version()
+        except sqlite3.Error:
+            return
+        if version != self.data_version:
+            self.data_version = version
+            previous_states = {(status[0], status[1]): budget_state(status[2], status[3])
+                               for status in self.budget_statuses}
+            self.load_expenses()
+            self.load_summary()
+            self.load_budgets()
+
+            # Alert for budgets another process has just pushed to a new warning level
+            crossed = []
+            for status in self.budget_statuses:
+                state = budget_state(status[2], status[3])
+                if state != "OK" and state != previous_states.get((status[0], status[1])):
+                    crossed.append(status)
+            alerts = budget_alerts(crossed)
+            if alerts:
+                QMessageBox.warning(self, "Budget Alert", "\n".join(alerts))
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         self.tabs = QTabWidget()
@@ -132,12 +155,14 @@ class ExpenseTracker(QWidget):
         self.tabs.addTab(self.tab_manage_expenses, "Manage Expenses")
         self.tabs.addTab(self.tab_summary, "Summary")
         self.tabs.addTab(self.tab_export, "Export")
+        self.tabs.addTab(self.tab_budgets, "Budgets")
 
         # Initialize all tabs
         self.init_tab_add_expense()
         self.init_tab_manage_expenses()
         self.init_tab_summary()
         self.init_tab_export()
+        self.init_tab_budgets()
 
         main_layout.addWidget(self.tabs)
         self.setLayout(main_layout)
@@ -217,19 +242,24 @@ class ExpenseTracker(QWidget):
         else:
             stored_price = price
 
-        c.execute('''INSERT INTO expenses 
-                  (expense_type, good_or_service, price, currency, date) 
-                  VALUES (?, ?, ?, ?, ?)''',
-                  (expense_type, good_or_service, stored_price, currency,
-                   expense_date.strftime('%Y-%m-%d')))
-        conn.commit()
+        try:
+            self.db.execute('''INSERT INTO expenses 
+                       (expense_type, good_or_service, price, currency, date) 
+                       VALUES (?, ?, ?, ?, ?)''',
+                       (expense_type, good_or_service, stored_price, currency,
+                        expense_date.strftime('%Y-%m-%d')))
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", f"Failed to add expense: {str(e)}")
+            return
 
         # Clear inputs
         self.good_service_input.clear()
         self.price_input.clear()
         self.load_expenses()
         self.load_summary()
+        self.load_budgets()
         QMessageBox.information(self, "Success", "Expense added successfully!")
+        self.check_budget_alerts(expense_type, expense_date)
 
     def init_tab_manage_expenses(self):
         layout = QVBoxLayout(self.tab_manage_expenses)
@@ -279,29 +309,7 @@ class ExpenseTracker(QWidget):
         search_text = self.search_input.text().strip().lower()
         category_filter = self.category_filter.currentText()
 
-        query = '''SELECT id, expense_type, good_or_service, price, currency, date 
-                   FROM expenses'''
-        params = []
-        
-        conditions = []
-        if search_text:
-            conditions.append('''(LOWER(expense_type) LIKE ? OR 
-                               LOWER(good_or_service) LIKE ? OR 
-                               LOWER(date) LIKE ?)''')
-            like_pattern = f"%{search_text}%"
-            params.extend([like_pattern, like_pattern, like_pattern])
-        
-        if category_filter != "ALL CATEGORIES":
-            conditions.append("expense_type = ?")
-            params.append(category_filter)
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY date DESC"
-        
-        c.execute(query, params)
-        rows = c.fetchall()
+        rows = self.db.query(search_expenses, search_text, category_filter)
 
         self.expense_table.setRowCount(0)
         for row_data in rows:
@@ -333,11 +341,14 @@ class ExpenseTracker(QWidget):
         currency = self.expense_table.item(row, 4).text()
         date_str = self.expense_table.item(row, 5).text()
 
-        dialog = EditExpenseDialog(expense_id, expense_type, good_or_service, price, 
+        dialog = EditExpenseDialog(self.db, expense_id, expense_type, good_or_service, price, 
                                  currency, date_str, self.categories, self)
         if dialog.exec_():
             self.load_expenses()
             self.load_summary()
+            self.load_budgets()
+            self.check_budget_alerts(dialog.expense_type_combo.currentText(),
+                                     dialog.date_input.date().toPyDate())
 
     def delete_selected_expense(self):
         selected_rows = self.expense_table.selectionModel().selectedRows()
@@ -356,11 +367,15 @@ class ExpenseTracker(QWidget):
                                     QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            c.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
-            conn.commit()
+            try:
+                self.db.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+            except sqlite3.Error as e:
+                QMessageBox.warning(self, "Database Error", f"Failed to delete expense: {str(e)}")
+                return
             
             self.load_expenses()
             self.load_summary()
+            self.load_budgets()
 
     def init_tab_summary(self):
         layout = QVBoxLayout(self.tab_summary)
@@ -426,63 +441,23 @@ class ExpenseTracker(QWidget):
         start_date = self.summary_start_date.date().toPyDate()
         end_date = self.summary_end_date.date().toPyDate()
 
-        # Get filtered data
-        query = '''SELECT date, expense_type, SUM(price), currency 
-                   FROM expenses 
-                   WHERE date BETWEEN ? AND ?'''
-        params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if category != "ALL CATEGORIES":
-            query += " AND expense_type = ?"
-            params.append(category)
-        
-        query += " GROUP BY date, expense_type, currency ORDER BY date"
-        
-        c.execute(query, params)
-        rows = c.fetchall()
-
-        # Calculate statistics
-        total_query = '''SELECT SUM(price) FROM expenses WHERE date BETWEEN ? AND ?'''
-        total_params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if category != "ALL CATEGORIES":
-            total_query += " AND expense_type = ?"
-            total_params.append(category)
-        
-        c.execute(total_query, total_params)
-        total = c.fetchone()[0] or 0
-        
-        days = (end_date - start_date).days + 1
-        average = total / days if days > 0 else 0
+        summary = self.db.query(fetch_summary, start_date, end_date, category)
+        daily_totals = summary["daily_totals"]
+        category_totals = summary["category_totals"]
         
-        category_query = '''SELECT expense_type, SUM(price) as total 
-                            FROM expenses 
-                            WHERE date BETWEEN ? AND ?
-                            GROUP BY expense_type 
-                            ORDER BY total DESC 
-                            LIMIT 1'''
-        c.execute(category_query, [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')])
-        top_category = c.fetchone()
+        self.total_label.setText(f"Total: ${summary['total']:.2f}")
+        self.average_label.setText(f"Daily Average: ${summary['daily_average']:.2f}")
         
-        self.total_label.setText(f"Total: ${total:.2f}")
-        self.average_label.setText(f"Daily Average: ${average:.2f}")
-        
-        if top_category:
-            self.category_label.setText(f"Top Category: {top_category[0]} (${top_category[1]:.2f})")
+        if summary["top_category"]:
+            self.category_label.setText(f"Top Category: {summary['top_category']} "
+                                        f"(${summary['top_category_total']:.2f})")
         else:
             self.category_label.setText("Top Category: N/A ($0.00)")
 
         # Generate detailed summary
         summary_text = f"Expense Summary from {start_date} to {end_date}\n\n"
-        daily_totals = {}
-        category_totals = {}
-        
-        for date, expense_type, amount, currency in rows:
+        for date, expense_type, amount, currency in summary["entries"]:
             summary_text += f"{date} - {expense_type}: ${amount:.2f} {currency}\n"
-            daily_totals.setdefault(date, 0)
-            daily_totals[date] += amount
-            category_totals.setdefault(expense_type, 0)
-            category_totals[expense_type] += amount
         
         summary_text += "\nCategory Breakdown:\n"
         for category, total in category_totals.items():
@@ -569,30 +544,14 @@ class ExpenseTracker(QWidget):
         end_date = self.report_end_date.date().toPyDate()
         category = self.report_category.currentText()
 
-        query = '''SELECT date, expense_type, good_or_service, price, currency 
-                   FROM expenses 
-                   WHERE date BETWEEN ? AND ?'''
-        params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if category != "ALL CATEGORIES":
-            query += " AND expense_type = ?"
-            params.append(category)
-        
-        query += " ORDER BY date DESC"
-        
-        c.execute(query, params)
-        rows = c.fetchall()
+        rows, _ = self.db.query(fetch_report, start_date, end_date, category)
 
         file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV File", 
                                                  "expenses_export.csv", "CSV Files (*.csv)")
         
         if file_path:
             try:
-                with open(file_path, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Date', 'Category', 'Description', 'Amount', 'Currency'])
-                    for row in rows:
-                        writer.writerow(row)
+                write_csv_report(file_path, rows)
                 QMessageBox.information(self, "Export Successful", 
                                       f"Expenses exported to {file_path}")
             except Exception as e:
@@ -604,75 +563,135 @@ class ExpenseTracker(QWidget):
         end_date = self.report_end_date.date().toPyDate()
         category = self.report_category.currentText()
 
-        query = '''SELECT date, expense_type, good_or_service, price, currency 
-                   FROM expenses 
-                   WHERE date BETWEEN ? AND ?'''
-        params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if category != "ALL CATEGORIES":
-            query += " AND expense_type = ?"
-            params.append(category)
-        
-        query += " ORDER BY date DESC"
-        
-        c.execute(query, params)
-        rows = c.fetchall()
-
-        # Calculate totals
-        total_query = '''SELECT SUM(price) FROM expenses WHERE date BETWEEN ? AND ?'''
-        total_params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        
-        if category != "ALL CATEGORIES":
-            total_query += " AND expense_type = ?"
-            total_params.append(category)
-        
-        c.execute(total_query, total_params)
-        total = c.fetchone()[0] or 0
+        rows, total = self.db.query(fetch_report, start_date, end_date, category)
 
         file_path, _ = QFileDialog.getSaveFileName(self, "Save PDF File", 
                                                  "expenses_report.pdf", "PDF Files (*.pdf)")
         
         if file_path:
             try:
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", 'B', 16)
-                pdf.cell(0, 10, "Expense Report", ln=True, align='C')
-                
-                # Report details
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 10, f"Period: {start_date} to {end_date}", ln=True)
-                pdf.cell(0, 10, f"Category: {category}", ln=True)
-                pdf.cell(0, 10, f"Total Expenses: ${total:.2f}", ln=True)
-                pdf.ln(10)
-                
-                # Table header
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(40, 10, "Date", border=1)
-                pdf.cell(40, 10, "Category", border=1)
-                pdf.cell(60, 10, "Description", border=1)
-                pdf.cell(25, 10, "Amount", border=1)
-                pdf.cell(25, 10, "Currency", border=1, ln=True)
-                
-                # Table rows
-                pdf.set_font("Arial", '', 10)
-                for row in rows:
-                    pdf.cell(40, 10, row[0])
-                    pdf.cell(40, 10, row[1])
-                    pdf.cell(60, 10, row[2])
-                    pdf.cell(25, 10, f"{row[3]:.2f}", align='R')
-                    pdf.cell(25, 10, row[4], ln=True)
-                
-                pdf.output(file_path)
+                write_pdf_report(file_path, rows, total, start_date, end_date, category)
                 QMessageBox.information(self, "Export Successful", 
                                       f"Report exported to {file_path}")
             except Exception as e:
                 QMessageBox.warning(self, "Export Error", 
                                   f"Failed to export PDF: {str(e)}")
 
+    def init_tab_budgets(self):
+        layout = QVBoxLayout(self.tab_budgets)
+
+        # Budget form
+        form_group = QGroupBox("Set Budget")
+        form_layout = QHBoxLayout()
+
+        self.budget_category_combo = QComboBox()
+        self.budget_category_combo.addItems(self.categories)
+        form_layout.addWidget(QLabel("Category:"))
+        form_layout.addWidget(self.budget_category_combo)
+
+        self.budget_period_combo = QComboBox()
+        self.budget_period_combo.addItems(list(BUDGET_PERIODS))
+        form_layout.addWidget(QLabel("Period:"))
+        form_layout.addWidget(self.budget_period_combo)
+
+        self.budget_amount_input = QLineEdit()
+        self.budget_amount_input.setPlaceholderText("Limit (USD)")
+        form_layout.addWidget(QLabel("Limit:"))
+        form_layout.addWidget(self.budget_amount_input)
+
+        self.set_budget_btn = QPushButton("Set Budget")
+        self.set_budget_btn.clicked.connect(self.set_budget)
+        form_layout.addWidget(self.set_budget_btn)
+
+        form_group.setLayout(form_layout)
+        layout.addWidget(form_group)
+
+        # Budget status table
+        self.budget_table = QTableWidget()
+        self.budget_table.setColumnCount(6)
+        self.budget_table.setHorizontalHeaderLabels(["Category", "Period", "Budget", "Spent", "Remaining", "Status"])
+        self.budget_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.budget_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.budget_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(self.budget_table)
+
+        self.remove_budget_btn = QPushButton("Remove Selected Budget")
+        self.remove_budget_btn.clicked.connect(self.remove_selected_budget)
+        layout.addWidget(self.remove_budget_btn)
+
+        self.load_budgets()
+
+    def load_budgets(self):
+        self.budget_statuses = self.db.query(fetch_budget_status, date.today())
+
+        self.budget_table.setRowCount(0)
+        for expense_type, period, amount, spent in self.budget_statuses:
+            row = self.budget_table.rowCount()
+            self.budget_table.insertRow(row)
+
+            status = budget_state(amount, spent)
+            values = [expense_type, period, f"{amount:.2f}", f"{spent:.2f}", f"{amount - spent:.2f}", status]
+            for col, value in enumerate(values):
+                self.budget_table.setItem(row, col, QTableWidgetItem(value))
+
+    def set_budget(self):
+        expense_type = self.budget_category_combo.currentText()
+        period = self.budget_period_combo.currentText()
+        try:
+            amount = float(self.budget_amount_input.text().strip())
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "Please enter a valid budget amount.")
+            return
+        if not math.isfinite(amount) or amount <= 0:
+            QMessageBox.warning(self, "Input Error", "Budget amount must be a number greater than zero.")
+            return
+
+        try:
+            self.db.execute('''INSERT OR REPLACE INTO budgets (expense_type, period, amount) 
+                       VALUES (?, ?, ?)''', (expense_type, period, amount))
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", f"Failed to save budget: {str(e)}")
+            return
+
+        self.budget_amount_input.clear()
+        self.load_budgets()
+        self.check_budget_alerts(expense_type, date.today())
+
+    def remove_selected_budget(self):
+        selected_rows = self.budget_table.selectionModel().selectedRows()
+        if not selected_rows:
+            QMessageBox.warning(self, "Selection Error", "Please select a budget to remove.")
+            return
+
+        row = selected_rows[0].row()
+        expense_type = self.budget_table.item(row, 0).text()
+        period = self.budget_table.item(row, 1).text()
+        try:
+            self.db.execute("DELETE FROM budgets WHERE expense_type = ? AND period = ?", (expense_type, period))
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Database Error", f"Failed to remove budget: {str(e)}")
+            return
+        self.load_budgets()
+
+    def check_budget_alerts(self, expense_type, expense_date):
+        alerts = budget_alerts(self.db.query(fetch_budget_status, expense_date, expense_type))
+        if alerts:
+            QMessageBox.warning(self, "Budget Alert", "\n".join(alerts))
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = build_parser()
+    args, qt_args = parser.parse_known_args()
+
+    # Headless modes live in expensebackend; they are kept here for convenience
+    if args.server or args.batch_reports:
+        sys.exit(run_cli(parser, args))
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle('Fusion')
-    window = ExpenseTracker()
+
+    # Database setup
+    db = Database(DB_PATH)
+    db.initialize()
+    window = ExpenseTracker(db)
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
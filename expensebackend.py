@@ -0,0 +1,730 @@
+import sys
+import csv
+import io
+import sqlite3
+import os
+import json
+import math
+import asyncio
+import argparse
+import threading
+import time
+import calendar
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
+from urllib.parse import urlsplit, parse_qs, quote
+
+# Database setup
+DB_PATH = 'expenses.db'
+
+class Database:
+    def __init__(self, path=DB_PATH, timeout=5.0, retries=5, backoff=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.local = threading.local()
+
+    def connect(self, read_only=False, check_same_thread=True):
+        if read_only:
+            connection = sqlite3.connect(f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True,
+                                         timeout=self.timeout, check_same_thread=check_same_thread)
+        else:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         check_same_thread=check_same_thread)
+        connection.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        if not read_only:
+            # The first statement reads the schema, which can hit a lock held by another process
+            self.retry(connection.execute, "PRAGMA synchronous = NORMAL")
+        return connection
+
+    @property
+    def connection(self):
+        # Each thread gets its own connection instead of sharing one cursor
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self.connect()
+        return connection
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    def close(self):
+        # Only closes the calling thread's connection
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def retry(self, func, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                if attempt == self.retries or ("locked" not in message and "busy" not in message):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def execute(self, query, params=()):
+        return self.retry(self._execute, query, params)
+
+    def _execute(self, query, params):
+        # Commits on success and rolls back on failure so a retry starts clean
+        with self.connection:
+            return self.connection.execute(query, params)
+
+    def query(self, func, *args):
+        return self.retry(lambda: func(self.cursor(), *args))
+
+    def data_version(self):
+        # Changes whenever another connection (or process) commits to the file
+        return self.retry(lambda: self.connection.execute("PRAGMA data_version").fetchone()[0])
+
+    def initialize(self):
+        # WAL lets readers keep working while another process writes. The mode is stored
+        # in the file, but switching to it needs an exclusive lock, so do it once, with retries
+        self.retry(lambda: self.connection.execute("PRAGMA journal_mode = WAL").fetchone())
+        self.retry(self._initialize)
+
+    def _initialize(self):
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                expense_type TEXT,
+                good_or_service TEXT,
+                price REAL,
+                currency TEXT DEFAULT 'USD',
+                date TEXT
+            )
+            ''')
+            backfill = connection.execute("""SELECT 1 FROM sqlite_master 
+                                             WHERE type = 'table' AND name = 'budget_spend'""").fetchone() is None
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS budgets (
+                expense_type TEXT,
+                period TEXT,
+                amount REAL,
+                PRIMARY KEY (expense_type, period)
+            )
+            ''')
+            connection.execute('''
+            CREATE TABLE IF NOT EXISTS budget_spend (
+                expense_type TEXT,
+                period TEXT,
+                period_key TEXT,
+                spent_cents INTEGER DEFAULT 0,
+                PRIMARY KEY (expense_type, period, period_key)
+            )
+            ''')
+
+            # Triggers keep the running totals in step with every write, from any process
+            connection.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS expenses_budget_insert AFTER INSERT ON expenses
+            BEGIN
+                {budget_spend_adjustment("NEW", "+")}
+            END
+            ''')
+            connection.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS expenses_budget_update
+            AFTER UPDATE OF expense_type, price, date ON expenses
+            BEGIN
+                {budget_spend_adjustment("OLD", "-")}
+                {budget_spend_adjustment("NEW", "+")}
+            END
+            ''')
+            connection.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS expenses_budget_delete AFTER DELETE ON expenses
+            BEGIN
+                {budget_spend_adjustment("OLD", "-")}
+            END
+            ''')
+
+            # One-off aggregation for databases created before budgets existed
+            if backfill:
+                for period, key in BUDGET_PERIODS.items():
+                    connection.execute(f'''INSERT INTO budget_spend (expense_type, period, period_key, spent_cents) 
+                                          SELECT expense_type, ?, {key.format(date="date")}, 
+                                                 SUM({PRICE_CENTS.format(price="price")}) 
+                                          FROM expenses 
+                                          GROUP BY 1, 3''', (period,))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+# SQL expressions mapping an expense date to the budget period it falls in
+BUDGET_PERIODS = {
+    "monthly": "strftime('%Y-%m', {date})",
+    "weekly": "date({date}, 'weekday 0', '-6 days')",
+}
+BUDGET_ALERT_THRESHOLD = 0.8
+# Running totals are kept in whole cents so repeated add/edit/delete cycles cannot drift
+PRICE_CENTS = "CAST(ROUND(COALESCE({price}, 0) * 100) AS INTEGER)"
+
+def budget_spend_adjustment(row, sign):
+    statements = []
+    for period, key in BUDGET_PERIODS.items():
+        key = key.format(date=f"{row}.date")
+        statements.append(f'''INSERT OR IGNORE INTO budget_spend (expense_type, period, period_key, spent_cents) 
+                VALUES ({row}.expense_type, '{period}', {key}, 0);''')
+        statements.append(f'''UPDATE budget_spend SET spent_cents = spent_cents {sign} {PRICE_CENTS.format(price=f"{row}.price")} 
+                WHERE expense_type = {row}.expense_type AND period = '{period}' AND period_key = {key};''')
+    return "\n                ".join(statements)
+
+def budget_period_key(period, expense_date):
+    if period == "monthly":
+        return expense_date.strftime('%Y-%m')
+    # Weeks start on Monday, matching the 'weekly' SQL expression above
+    return (expense_date - timedelta(days=expense_date.weekday())).strftime('%Y-%m-%d')
+
+default_categories = ["FOOD", "HOUSEHOLD", "TRANSPORTATION", "ENTERTAINMENT", "HEALTH", "OTHER"]
+default_currencies = ["USD", "EUR", "GBP", "JPY", "INR"]
+
+def search_expenses(cursor, search_text="", category_filter="ALL CATEGORIES"):
+    query = '''SELECT id, expense_type, good_or_service, price, currency, date 
+               FROM expenses'''
+    params = []
+    
+    conditions = []
+    if search_text:
+        conditions.append('''(LOWER(expense_type) LIKE ? OR 
+                           LOWER(good_or_service) LIKE ? OR 
+                           LOWER(date) LIKE ?)''')
+        like_pattern = f"%{search_text}%"
+        params.extend([like_pattern, like_pattern, like_pattern])
+    
+    if category_filter != "ALL CATEGORIES":
+        conditions.append("expense_type = ?")
+        params.append(category_filter)
+    
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    
+    query += " ORDER BY date DESC"
+    
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+def fetch_report(cursor, start_date, end_date, category="ALL CATEGORIES"):
+    query = '''SELECT date, expense_type, good_or_service, price, currency 
+               FROM expenses 
+               WHERE date BETWEEN ? AND ?'''
+    params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+    
+    if category != "ALL CATEGORIES":
+        query += " AND expense_type = ?"
+        params.append(category)
+    
+    query += " ORDER BY date DESC"
+    
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    # Calculate totals
+    total_query = '''SELECT SUM(price) FROM expenses WHERE date BETWEEN ? AND ?'''
+    
+    if category != "ALL CATEGORIES":
+        total_query += " AND expense_type = ?"
+    
+    cursor.execute(total_query, params)
+    total = cursor.fetchone()[0] or 0
+    return rows, total
+
+def parse_date(date_str):
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date (expected YYYY-MM-DD): {date_str}")
+
+def parse_range(query):
+    end_date = parse_date(query["end"]) if "end" in query else date.today()
+    start_date = parse_date(query["start"]) if "start" in query else end_date.replace(day=1)
+    return start_date, end_date, query.get("category", "ALL CATEGORIES")
+
+def fetch_summary(cursor, start_date, end_date, category="ALL CATEGORIES"):
+    query = '''SELECT date, expense_type, SUM(price), currency 
+               FROM expenses 
+               WHERE date BETWEEN ? AND ?'''
+    params = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+    
+    if category != "ALL CATEGORIES":
+        query += " AND expense_type = ?"
+        params.append(category)
+    
+    query += " GROUP BY date, expense_type, currency ORDER BY date"
+    
+    cursor.execute(query, params)
+    entries = cursor.fetchall()
+
+    daily_totals = {}
+    category_totals = {}
+    for expense_date, expense_type, amount, currency in entries:
+        daily_totals[expense_date] = daily_totals.get(expense_date, 0) + amount
+        category_totals[expense_type] = category_totals.get(expense_type, 0) + amount
+
+    total = sum(category_totals.values())
+    days = (end_date - start_date).days + 1
+
+    # The top category is ranked across all categories, whatever the filter
+    cursor.execute('''SELECT expense_type, SUM(price) as total 
+                      FROM expenses 
+                      WHERE date BETWEEN ? AND ?
+                      GROUP BY expense_type 
+                      ORDER BY total DESC 
+                      LIMIT 1''', params[:2])
+    top_category = cursor.fetchone()
+    return {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "category": category,
+        "total": total,
+        "daily_average": total / days if days > 0 else 0,
+        "top_category": top_category[0] if top_category else None,
+        "top_category_total": top_category[1] if top_category else 0,
+        "category_totals": category_totals,
+        "daily_totals": daily_totals,
+        "entries": [list(entry) for entry in entries],
+    }
+
+def write_csv_report(file_path, rows):
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date', 'Category', 'Description', 'Amount', 'Currency'])
+        for row in rows:
+            writer.writerow(row)
+
+def write_pdf_report(file_path, rows, total, start_date, end_date, category):
+    # Imported here so CSV-only runs and the API server do not need fpdf
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, "Expense Report", ln=True, align='C')
+    
+    # Report details
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 10, f"Period: {start_date} to {end_date}", ln=True)
+    pdf.cell(0, 10, f"Category: {category}", ln=True)
+    pdf.cell(0, 10, f"Total Expenses: ${total:.2f}", ln=True)
+    pdf.ln(10)
+    
+    # Table header
+    pdf.set_font("Arial", 'B', 12)
+    pdf.cell(40, 10, "Date", border=1)
+    pdf.cell(40, 10, "Category", border=1)
+    pdf.cell(60, 10, "Description", border=1)
+    pdf.cell(25, 10, "Amount", border=1)
+    pdf.cell(25, 10, "Currency", border=1, ln=True)
+    
+    # Table rows
+    pdf.set_font("Arial", '', 10)
+    for row in rows:
+        pdf.cell(40, 10, row[0])
+        pdf.cell(40, 10, row[1])
+        pdf.cell(60, 10, row[2])
+        pdf.cell(25, 10, f"{row[3]:.2f}", align='R')
+        pdf.cell(25, 10, row[4], ln=True)
+    
+    pdf.output(file_path)
+
+def fetch_budget_status(cursor, as_of, expense_type=None):
+    # Primary-key lookups into the running totals, independent of history size
+    query = '''SELECT b.expense_type, b.period, b.amount, COALESCE(s.spent_cents, 0) / 100.0 
+               FROM budgets b 
+               LEFT JOIN budget_spend s 
+                 ON s.expense_type = b.expense_type AND s.period = b.period 
+                AND s.period_key = CASE b.period WHEN 'monthly' THEN ? ELSE ? END'''
+    params = [budget_period_key("monthly", as_of), budget_period_key("weekly", as_of)]
+    
+    if expense_type is not None:
+        query += " WHERE b.expense_type = ?"
+        params.append(expense_type)
+    
+    query += " ORDER BY b.expense_type, b.period"
+    
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+def budget_state(amount, spent, threshold=BUDGET_ALERT_THRESHOLD):
+    if spent > amount:
+        return "OVER BUDGET"
+    if amount > 0 and spent >= amount * threshold:
+        return "WARNING"
+    return "OK"
+
+def budget_alerts(statuses, threshold=BUDGET_ALERT_THRESHOLD):
+    alerts = []
+    for expense_type, period, amount, spent in statuses:
+        if amount > 0 and budget_state(amount, spent, threshold) != "OK":
+            state = "exceeded" if spent > amount else "almost used"
+            alerts.append(f"{expense_type} {period} budget {state}: "
+                          f"${spent:.2f} of ${amount:.2f} ({spent / amount:.0%})")
+    return alerts
+
+class ExpenseServer:
+    HTTP_STATUS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                   413: "Payload Too Large", 431: "Request Header Fields Too Large",
+                   500: "Internal Server Error"}
+    MAX_BODY = 16 * 1024 * 1024
+    MAX_HEADERS = 100
+
+    def __init__(self, host="127.0.0.1", port=8765, db_path=DB_PATH, pool_size=4, batch_size=500,
+                 rate_workers=8):
+        self.host = host
+        self.port = port
+        self.db = Database(db_path)
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.rate_workers = rate_workers
+        self.currency_rates = None
+        self.routes = {
+            ("POST", "/expenses"): self.api_add,
+            ("GET", "/expenses"): self.api_search,
+            ("GET", "/summary"): self.api_summary,
+            ("GET", "/export"): self.api_export,
+        }
+
+    async def start(self):
+        self.db.initialize()
+
+        # Readers share a small pool of connections; all inserts go through one writer
+        self.read_executor = ThreadPoolExecutor(max_workers=self.pool_size)
+        self.write_executor = ThreadPoolExecutor(max_workers=1)
+        # Exchange rate lookups block on the network, so keep them off the database readers
+        self.rate_executor = ThreadPoolExecutor(max_workers=self.rate_workers)
+        self.read_pool = asyncio.Queue()
+        for _ in range(self.pool_size):
+            self.read_pool.put_nowait(self.db.connect(read_only=True, check_same_thread=False))
+        self.write_conn = self.db.connect(check_same_thread=False)
+        self.write_queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.batch_writer())
+        self.clients = {}
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        # Closing idle keep-alive connections lets their handlers finish on EOF
+        for writer in list(self.clients):
+            writer.close()
+        await asyncio.gather(*self.clients.values(), return_exceptions=True)
+        await self.server.wait_closed()
+        await self.write_queue.join()
+        self.writer_task.cancel()
+        self.read_executor.shutdown()
+        self.write_executor.shutdown()
+        self.rate_executor.shutdown()
+        while not self.read_pool.empty():
+            self.read_pool.get_nowait().close()
+        self.write_conn.close()
+        # initialize() ran on this thread and left its connection open
+        self.db.close()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Expense API listening on http://{self.host}:{self.port}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def batch_writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.write_queue.get()]
+            while len(batch) < self.batch_size and not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+
+            try:
+                ids = await loop.run_in_executor(self.write_executor, self.insert_batch,
+                                                 [row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), expense_id in zip(batch, ids):
+                    if not future.done():
+                        future.set_result(expense_id)
+            finally:
+                for _ in batch:
+                    self.write_queue.task_done()
+
+    def insert_batch(self, rows):
+        return self.db.retry(self.write_batch, rows)
+
+    def write_batch(self, rows):
+        ids = []
+        with self.write_conn:
+            for row in rows:
+                cursor = self.write_conn.execute('''INSERT INTO expenses 
+                                                 (expense_type, good_or_service, price, currency, date) 
+                                                 VALUES (?, ?, ?, ?, ?)''', row)
+                ids.append(cursor.lastrowid)
+        return ids
+
+    async def read(self, func, *args):
+        connection = await self.read_pool.get()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.read_executor, self.db.retry,
+                                              func, connection.cursor(), *args)
+        finally:
+            self.read_pool.put_nowait(connection)
+
+    async def handle_client(self, reader, writer):
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                # readline raises ValueError once a line passes the reader's 64 KiB limit
+                try:
+                    request_line = await reader.readline()
+                except ValueError:
+                    await self.send(writer, 400, {"error": "Request line too long"}, False)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.send(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    try:
+                        line = await reader.readline()
+                    except ValueError:
+                        line = None
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if line is None or len(headers) >= self.MAX_HEADERS:
+                        headers = None
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers is None:
+                    await self.send(writer, 431, {"error": "Request headers too large"}, False)
+                    break
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= self.MAX_BODY:
+                    await self.send(writer, 413 if length > 0 else 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self.dispatch(method, target, body)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    async def send(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            content_type = "text/csv; charset=utf-8"
+            data = payload.encode("utf-8")
+        else:
+            content_type = "application/json"
+            data = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {self.HTTP_STATUS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            return 404, {"error": f"No route for {method} {url.path}"}
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            return await handler(query, body)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    def parse_expense(self, item):
+        if not isinstance(item, dict):
+            raise ValueError("Each expense must be a JSON object")
+        expense_type = item.get("expense_type", "OTHER")
+        good_or_service = str(item.get("good_or_service", "")).strip()
+        currency = item.get("currency", "USD")
+        date_str = item.get("date") or date.today().strftime('%Y-%m-%d')
+
+        if expense_type not in default_categories:
+            raise ValueError(f"Unknown expense type: {expense_type}")
+        if not good_or_service:
+            raise ValueError("Please enter a good or service.")
+        if currency not in default_currencies:
+            raise ValueError(f"Unsupported currency: {currency}")
+        try:
+            price = float(item.get("price"))
+        except (TypeError, ValueError):
+            raise ValueError("Please enter a valid price.")
+        if not math.isfinite(price):
+            # SQLite stores NaN as NULL, which breaks every later SUM and float()
+            raise ValueError("Please enter a valid price.")
+        expense_date = parse_date(date_str)
+        return expense_type, good_or_service, price, currency, expense_date
+
+    def usd_rate(self, currency, expense_date):
+        # None means the lookup failed; like the desktop app, the original amount is kept
+        try:
+            if self.currency_rates is None:
+                from forex_python.converter import CurrencyRates
+                self.currency_rates = CurrencyRates()
+            return self.currency_rates.get_rate(currency, "USD", expense_date)
+        except Exception:
+            return None
+
+    async def api_add(self, query, body):
+        payload = json.loads(body or b"null")
+        items = payload if isinstance(payload, list) else [payload]
+        expenses = [self.parse_expense(item) for item in items]
+
+        # Fetch each (currency, date) rate once, with all lookups running concurrently
+        loop = asyncio.get_running_loop()
+        lookups = list({(currency, expense_date) for _, _, _, currency, expense_date in expenses
+                        if currency != "USD"})
+        rates = await asyncio.gather(*(loop.run_in_executor(self.rate_executor, self.usd_rate, *key)
+                                       for key in lookups))
+        rates = dict(zip(lookups, rates))
+
+        futures = []
+        for expense_type, good_or_service, price, currency, expense_date in expenses:
+            if rates.get((currency, expense_date)) is not None:
+                price = price * rates[(currency, expense_date)]
+            future = loop.create_future()
+            self.write_queue.put_nowait(((expense_type, good_or_service, price, currency,
+                                          expense_date.strftime('%Y-%m-%d')), future))
+            futures.append(future)
+
+        ids = await asyncio.gather(*futures)
+        if isinstance(payload, list):
+            return 201, {"ids": ids}
+        return 201, {"id": ids[0]}
+
+    async def api_search(self, query, body):
+        rows = await self.read(search_expenses, query.get("q", "").strip().lower(),
+                               query.get("category", "ALL CATEGORIES"))
+        columns = ("id", "expense_type", "good_or_service", "price", "currency", "date")
+        return 200, [dict(zip(columns, row)) for row in rows]
+
+    async def api_summary(self, query, body):
+        start_date, end_date, category = parse_range(query)
+        summary = await self.read(fetch_summary, start_date, end_date, category)
+        return 200, summary
+
+    async def api_export(self, query, body):
+        start_date, end_date, category = parse_range(query)
+        rows, total = await self.read(fetch_report, start_date, end_date, category)
+        if query.get("format", "json") == "csv":
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(['Date', 'Category', 'Description', 'Amount', 'Currency'])
+            writer.writerows(rows)
+            return 200, output.getvalue()
+        columns = ("date", "expense_type", "good_or_service", "price", "currency")
+        return 200, {"start_date": str(start_date), "end_date": str(end_date), "category": category,
+                     "total": total, "expenses": [dict(zip(columns, row)) for row in rows]}
+
+def generate_report(db_path, file_path, report_format, start_date, end_date, category):
+    # Runs in a worker process, so it opens its own read-only connection
+    report_conn = Database(db_path).connect(read_only=True)
+    try:
+        rows, total = fetch_report(report_conn.cursor(), start_date, end_date, category)
+    finally:
+        report_conn.close()
+
+    if report_format == "csv":
+        write_csv_report(file_path, rows)
+    else:
+        write_pdf_report(file_path, rows, total, start_date, end_date, category)
+    return file_path
+
+def plan_report_jobs(cursor, output_dir, formats=("csv", "pdf")):
+    cursor.execute('''SELECT DISTINCT substr(date, 1, 7) AS month, expense_type 
+                      FROM expenses 
+                      ORDER BY month, expense_type''')
+    jobs = []
+    for month, category in cursor.fetchall():
+        year, month_number = (int(part) for part in month.split("-"))
+        start_date = date(year, month_number, 1)
+        end_date = date(year, month_number, calendar.monthrange(year, month_number)[1])
+        month_dir = os.path.join(output_dir, month)
+        for report_format in formats:
+            file_path = os.path.join(month_dir, f"{category}.{report_format}")
+            jobs.append((file_path, report_format, start_date, end_date, category))
+    return jobs
+
+def run_batch_reports(output_dir, db_path=DB_PATH, formats=("csv", "pdf"), workers=None):
+    batch_conn = Database(db_path).connect(read_only=True)
+    try:
+        jobs = plan_report_jobs(batch_conn.cursor(), output_dir, formats)
+    finally:
+        batch_conn.close()
+
+    for month_dir in {os.path.dirname(job[0]) for job in jobs}:
+        os.makedirs(month_dir, exist_ok=True)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_report, db_path, *job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                print(f"Wrote {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"Failed to write {futures[future]}: {e}", file=sys.stderr)
+    print(f"Generated {len(jobs) - failures} of {len(jobs)} reports in {output_dir}")
+    return failures
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Advanced Expense Tracker Pro")
+    parser.add_argument("--server", action="store_true", help="run the headless JSON API instead of the GUI")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --server to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port for --server to listen on (default: 8765)")
+    parser.add_argument("--batch-reports", metavar="DIR",
+                        help="write a CSV and PDF report per category per month into DIR, then exit")
+    parser.add_argument("--formats", default="csv,pdf", help="report formats for --batch-reports (default: csv,pdf)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --batch-reports (default: number of CPUs)")
+    return parser
+
+def run_cli(parser, args):
+    if args.batch_reports:
+        formats = tuple(fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip())
+        if not formats or not set(formats) <= {"csv", "pdf"}:
+            parser.error("--formats must be a comma-separated list of csv and pdf")
+        if args.workers is not None and args.workers <= 0:
+            parser.error("--workers must be a positive number")
+        return 1 if run_batch_reports(args.batch_reports, formats=formats, workers=args.workers) else 0
+
+    if args.server:
+        try:
+            asyncio.run(ExpenseServer(args.host, args.port).serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    parser.error("nothing to do: pass --server or --batch-reports")
+
+if __name__ == "__main__":
+    parser = build_parser()
+    sys.exit(run_cli(parser, parser.parse_args()))
@@ -0,0 +1,85 @@
+import sqlite3
+from datetime import date, timedelta
+
+from expensebackend import Database, budget_alerts, budget_period_key, fetch_budget_status
+
+
+def add(db, expense_type, price, expense_date):
+    return db.execute('''INSERT INTO expenses (expense_type, good_or_service, price, currency, date) 
+                         VALUES (?, 'item', ?, 'USD', ?)''', (expense_type, price, expense_date)).lastrowid
+
+
+def spend(db):
+    rows = db.execute("SELECT expense_type, period, period_key, spent_cents FROM budget_spend").fetchall()
+    return {(expense_type, period, key): cents for expense_type, period, key, cents in rows if cents}
+
+
+def test_triggers_track_insert_update_and_delete(tmp_path):
+    db = Database(str(tmp_path / "expenses.db"))
+    db.initialize()
+
+    expense_id = add(db, "FOOD", 12.5, "2025-01-31")
+    add(db, "FOOD", 7.25, "2025-01-27")
+    assert spend(db) == {("FOOD", "monthly", "2025-01"): 1975, ("FOOD", "weekly", "2025-01-27"): 1975}
+
+    # Moving an expense to another month and category shifts it between totals
+    db.execute("UPDATE expenses SET expense_type = 'HEALTH', price = 3, date = '2025-02-03' WHERE id = ?",
+               (expense_id,))
+    assert spend(db) == {("FOOD", "monthly", "2025-01"): 725, ("FOOD", "weekly", "2025-01-27"): 725,
+                         ("HEALTH", "monthly", "2025-02"): 300, ("HEALTH", "weekly", "2025-02-03"): 300}
+
+    db.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+    assert spend(db) == {("FOOD", "monthly", "2025-01"): 725, ("FOOD", "weekly", "2025-01-27"): 725}
+
+
+def test_totals_do_not_drift(tmp_path):
+    db = Database(str(tmp_path / "expenses.db"))
+    db.initialize()
+    db.execute("INSERT INTO budgets (expense_type, period, amount) VALUES ('FOOD', 'monthly', 0.3)")
+
+    ids = [add(db, "FOOD", price, "2025-03-03") for price in (0.1, 0.2)]
+    assert db.query(fetch_budget_status, date(2025, 3, 3)) == [("FOOD", "monthly", 0.3, 0.3)]
+    assert budget_alerts(db.query(fetch_budget_status, date(2025, 3, 3))) == [
+        "FOOD monthly budget almost used: $0.30 of $0.30 (100%)"]
+
+    for expense_id in ids:
+        db.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+    assert db.query(fetch_budget_status, date(2025, 3, 3)) == [("FOOD", "monthly", 0.3, 0.0)]
+
+
+def test_weekly_key_matches_sql():
+    connection = sqlite3.connect(":memory:")
+    for offset in range(14):
+        day = date(2025, 12, 25) + timedelta(days=offset)
+        sql_key = connection.execute("SELECT date(?, 'weekday 0', '-6 days')", (str(day),)).fetchone()[0]
+        assert sql_key == budget_period_key("weekly", day)
+        assert date.fromisoformat(sql_key).weekday() == 0
+    assert budget_period_key("monthly", date(2025, 12, 31)) == "2025-12"
+
+
+def test_backfill_existing_database_once(tmp_path):
+    path = str(tmp_path / "expenses.db")
+    connection = sqlite3.connect(path)
+    connection.execute('''CREATE TABLE expenses (
+                              id INTEGER PRIMARY KEY AUTOINCREMENT,
+                              expense_type TEXT,
+                              good_or_service TEXT,
+                              price REAL,
+                              currency TEXT DEFAULT 'USD',
+                              date TEXT
+                          )''')
+    connection.executemany("INSERT INTO expenses (expense_type, good_or_service, price, date) VALUES (?, 'x', ?, ?)",
+                           [("FOOD", 10, "2025-01-06"), ("FOOD", 2.5, "2025-01-12"), ("HEALTH", 4, "2025-02-01")])
+    connection.commit()
+    connection.close()
+
+    db = Database(path)
+    db.initialize()
+    expected = {("FOOD", "monthly", "2025-01"): 1250, ("FOOD", "weekly", "2025-01-06"): 1250,
+                ("HEALTH", "monthly", "2025-02"): 400, ("HEALTH", "weekly", "2025-01-27"): 400}
+    assert spend(db) == expected
+
+    # Opening the database again must not aggregate a second time
+    reopened = Database(path)
+    reopened.initialize()
+    assert spend(reopened) == expected
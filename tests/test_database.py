@@ -0,0 +1,123 @@
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import expensebackend
+from expensebackend import Database
+
+WRITERS = 6
+READERS = 2
+ROWS_PER_WRITER = 300
+
+
+def write_rows(db_path, writer):
+    db = Database(db_path)
+    for i in range(ROWS_PER_WRITER):
+        db.execute('''INSERT INTO expenses (expense_type, good_or_service, price, currency, date)
+                      VALUES ('FOOD', ?, 1, 'USD', '2025-01-10')''', (f"writer {writer} row {i}",))
+    return ROWS_PER_WRITER
+
+
+def read_rows(db_path, expected):
+    db = Database(db_path)
+    connection = db.connect(read_only=True)
+    last = 0
+    deadline = time.monotonic() + 60
+    while last < expected and time.monotonic() < deadline:
+        # One statement reads one snapshot, so the trigger-maintained total must match it
+        count, cents = db.retry(lambda: connection.execute('''SELECT
+            (SELECT COUNT(*) FROM expenses),
+            (SELECT COALESCE(SUM(spent_cents), 0) FROM budget_spend WHERE period = 'monthly')''').fetchone())
+        assert cents == count * 100
+        assert count >= last
+        last = count
+    connection.close()
+    return last
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    db_path = str(tmp_path / "expenses.db")
+    Database(db_path).initialize()
+    expected = WRITERS * ROWS_PER_WRITER
+
+    with ProcessPoolExecutor(max_workers=WRITERS + READERS) as executor:
+        readers = [executor.submit(read_rows, db_path, expected) for _ in range(READERS)]
+        writers = [executor.submit(write_rows, db_path, writer) for writer in range(WRITERS)]
+        assert sum(future.result() for future in writers) == expected
+        assert [future.result() for future in readers] == [expected] * READERS
+
+    db = Database(db_path)
+    assert db.execute("SELECT COUNT(DISTINCT good_or_service) FROM expenses").fetchone()[0] == expected
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+class Flaky:
+    def __init__(self, failures, message="database is locked"):
+        self.failures = failures
+        self.message = message
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise sqlite3.OperationalError(self.message)
+        return value
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(expensebackend.time, "sleep", delays.append)
+    return delays
+
+
+def test_retry_backs_off_until_the_lock_clears(tmp_path, sleeps):
+    db = Database(str(tmp_path / "expenses.db"), retries=5, backoff=0.1)
+    func = Flaky(failures=3)
+    assert db.retry(func, "done") == "done"
+    assert func.calls == 4
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4])
+
+
+def test_retry_gives_up_after_retries(tmp_path, sleeps):
+    db = Database(str(tmp_path / "expenses.db"), retries=2, backoff=0.1)
+    func = Flaky(failures=10, message="database is busy")
+    with pytest.raises(sqlite3.OperationalError, match="busy"):
+        db.retry(func, "done")
+    assert func.calls == 3
+    assert sleeps == pytest.approx([0.1, 0.2])
+
+
+def test_retry_does_not_retry_other_errors(tmp_path, sleeps):
+    db = Database(str(tmp_path / "expenses.db"))
+    func = Flaky(failures=1, message="no such table: expenses")
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        db.retry(func, "done")
+    assert func.calls == 1
+
+    def duplicate(value):
+        raise sqlite3.IntegrityError("UNIQUE constraint failed")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.retry(duplicate, "done")
+    assert sleeps == []
+
+
+def test_data_version_changes_on_commits_from_other_connections(tmp_path):
+    db_path = str(tmp_path / "expenses.db")
+    gui = Database(db_path)
+    gui.initialize()
+    other = Database(db_path)
+
+    version = gui.data_version()
+    assert gui.data_version() == version
+
+    # The connection's own commits do not count; the GUI reloads itself after those
+    gui.execute("INSERT INTO expenses (expense_type, good_or_service, price) VALUES ('FOOD', 'own', 1)")
+    assert gui.data_version() == version
+
+    other.execute("INSERT INTO expenses (expense_type, good_or_service, price) VALUES ('FOOD', 'other', 1)")
+    changed = gui.data_version()
+    assert changed != version
+    assert gui.data_version() == changed
@@ -0,0 +1,70 @@
+import csv
+import os
+from datetime import date
+
+import pytest
+
+from expensebackend import Database, build_parser, plan_report_jobs, run_batch_reports, run_cli
+
+
+def make_db(tmp_path):
+    db = Database(str(tmp_path / "expenses.db"))
+    db.initialize()
+    for row in [("FOOD", "Lunch", 12.5, "2024-02-01"),
+                ("FOOD", "Dinner", 20.0, "2024-02-29"),
+                ("HEALTH", "Pharmacy", 7.25, "2024-02-15"),
+                ("FOOD", "Groceries", 30.0, "2024-03-31"),
+                ("FOOD", "Snack", 3.0, "2024-04-01")]:
+        db.execute('''INSERT INTO expenses (expense_type, good_or_service, price, currency, date) 
+                      VALUES (?, ?, ?, 'USD', ?)''', row)
+    return db
+
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_plan_covers_each_category_and_month(tmp_path):
+    db = make_db(tmp_path)
+    out = str(tmp_path / "reports")
+    jobs = plan_report_jobs(db.cursor(), out, formats=("csv",))
+    assert [(os.path.relpath(path, out), start, end) for path, _, start, end, _ in jobs] == [
+        (os.path.join("2024-02", "FOOD.csv"), date(2024, 2, 1), date(2024, 2, 29)),
+        (os.path.join("2024-02", "HEALTH.csv"), date(2024, 2, 1), date(2024, 2, 29)),
+        (os.path.join("2024-03", "FOOD.csv"), date(2024, 3, 1), date(2024, 3, 31)),
+        (os.path.join("2024-04", "FOOD.csv"), date(2024, 4, 1), date(2024, 4, 30)),
+    ]
+
+
+def test_batch_reports_write_csv_per_category_and_month(tmp_path):
+    db_path = make_db(tmp_path).path
+    out = tmp_path / "reports"
+    assert run_batch_reports(str(out), db_path=db_path, formats=("csv",), workers=2) == 0
+
+    written = sorted(str(path.relative_to(out)) for path in out.rglob("*") if path.is_file())
+    assert written == [os.path.join("2024-02", "FOOD.csv"), os.path.join("2024-02", "HEALTH.csv"),
+                       os.path.join("2024-03", "FOOD.csv"), os.path.join("2024-04", "FOOD.csv")]
+
+    header = ['Date', 'Category', 'Description', 'Amount', 'Currency']
+    assert read_csv(out / "2024-02" / "FOOD.csv") == [header,
+                                                      ["2024-02-29", "FOOD", "Dinner", "20.0", "USD"],
+                                                      ["2024-02-01", "FOOD", "Lunch", "12.5", "USD"]]
+    assert read_csv(out / "2024-02" / "HEALTH.csv") == [header,
+                                                        ["2024-02-15", "HEALTH", "Pharmacy", "7.25", "USD"]]
+    # Month ends are inclusive and nothing leaks into the next month
+    assert read_csv(out / "2024-03" / "FOOD.csv") == [header,
+                                                      ["2024-03-31", "FOOD", "Groceries", "30.0", "USD"]]
+    assert read_csv(out / "2024-04" / "FOOD.csv") == [header, ["2024-04-01", "FOOD", "Snack", "3.0", "USD"]]
+
+
+@pytest.mark.parametrize("argv", [["--batch-reports", "out", "--workers", "0"],
+                                  ["--batch-reports", "out", "--workers", "-2"],
+                                  ["--batch-reports", "out", "--formats", "docx"]])
+def test_cli_rejects_bad_batch_options(tmp_path, monkeypatch, argv):
+    monkeypatch.chdir(tmp_path)
+    parser = build_parser()
+    with pytest.raises(SystemExit) as excinfo:
+        run_cli(parser, parser.parse_args(argv))
+    assert excinfo.value.code == 2
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+
+from expensebackend import ExpenseServer
+
+
+async def request(port, method, path, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+    for name, value in (headers or {"Content-Length": str(len(body))}).items():
+        head += f"{name}: {value}\r\n"
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    if b"application/json" in head:
+        return status, json.loads(payload)
+    return status, payload.decode("utf-8")
+
+
+def post_json(port, payload):
+    return request(port, "POST", "/expenses", json.dumps(payload).encode("utf-8"))
+
+
+def run_server(tmp_path, scenario):
+    async def main():
+        server = ExpenseServer(port=0, db_path=str(tmp_path / "expenses.db"))
+        await server.start()
+        try:
+            return await scenario(server.port)
+        finally:
+            await server.stop()
+            assert getattr(server.db.local, "connection", None) is None
+    return asyncio.run(main())
+
+
+def test_add_search_summary_export(tmp_path):
+    async def scenario(port):
+        status, body = await post_json(port, {"expense_type": "FOOD", "good_or_service": "Lunch",
+                                              "price": 12.5, "date": "2025-01-10"})
+        assert (status, body) == (201, {"id": 1})
+
+        status, body = await post_json(port, [
+            {"expense_type": "FOOD", "good_or_service": "Dinner", "price": 20, "date": "2025-01-10"},
+            {"expense_type": "HEALTH", "good_or_service": "Pharmacy", "price": "7.5", "date": "2025-01-12"},
+        ])
+        assert (status, body) == (201, {"ids": [2, 3]})
+
+        status, body = await request(port, "GET", "/expenses?q=din&category=FOOD")
+        assert status == 200
+        assert [row["good_or_service"] for row in body] == ["Dinner"]
+
+        status, body = await request(port, "GET", "/summary?start=2025-01-01&end=2025-01-31")
+        assert status == 200
+        assert body["total"] == 40
+        assert body["top_category"] == "FOOD"
+        assert body["category_totals"] == {"FOOD": 32.5, "HEALTH": 7.5}
+        assert body["daily_totals"] == {"2025-01-10": 32.5, "2025-01-12": 7.5}
+
+        status, body = await request(port, "GET", "/export?start=2025-01-01&end=2025-01-31&category=FOOD")
+        assert status == 200
+        assert body["total"] == 32.5
+        assert len(body["expenses"]) == 2
+
+        status, body = await request(port, "GET", "/export?start=2025-01-11&end=2025-01-31&format=csv")
+        assert status == 200
+        assert body.splitlines() == ["Date,Category,Description,Amount,Currency",
+                                     "2025-01-12,HEALTH,Pharmacy,7.5,USD"]
+
+    run_server(tmp_path, scenario)
+
+
+def test_rejects_invalid_requests(tmp_path):
+    async def scenario(port):
+        status, body = await post_json(port, {"expense_type": "NOPE", "good_or_service": "x", "price": 1})
+        assert status == 400
+
+        status, body = await request(port, "POST", "/expenses", b"{not json")
+        assert status == 400
+
+        for price in ("NaN", "Infinity", "-Infinity"):
+            raw = f'{{"expense_type": "FOOD", "good_or_service": "x", "price": {price}}}'.encode()
+            status, body = await request(port, "POST", "/expenses", raw)
+            assert (status, body) == (400, {"error": "Please enter a valid price."})
+
+        status, body = await request(port, "GET", "/summary?start=2025-13-01")
+        assert status == 400
+
+        status, body = await request(port, "GET", "/nope")
+        assert status == 404
+
+        status, body = await request(port, "POST", "/expenses",
+                                     headers={"Content-Length": str(ExpenseServer.MAX_BODY + 1)})
+        assert status == 413
+
+        status, body = await request(port, "GET", "/" + "x" * 70000)
+        assert (status, body) == (400, {"error": "Request line too long"})
+
+        status, body = await request(port, "GET", "/expenses", headers={"X-Padding": "x" * 70000})
+        assert (status, body) == (431, {"error": "Request headers too large"})
+
+        headers = {f"X-Header-{i}": "x" for i in range(ExpenseServer.MAX_HEADERS + 1)}
+        status, body = await request(port, "GET", "/expenses", headers=headers)
+        assert status == 431
+
+        # Nothing above should have reached the database
+        status, body = await request(port, "GET", "/expenses")
+        assert (status, body) == (200, [])
+
+    run_server(tmp_path, scenario)
+
+
+def test_converts_each_rate_once_concurrently(tmp_path):
+    class FakeRates:
+        def __init__(self):
+            self.calls = []
+            # Both lookups must be in flight at once to get past the barrier
+            self.barrier = threading.Barrier(2, timeout=5)
+
+        def get_rate(self, base, dest, date_obj):
+            self.calls.append((base, dest, str(date_obj)))
+            self.barrier.wait()
+            if base == "JPY":
+                raise ConnectionError("rate service unavailable")
+            return 2.0
+
+    async def main():
+        server = ExpenseServer(port=0, db_path=str(tmp_path / "expenses.db"))
+        server.currency_rates = FakeRates()
+        await server.start()
+        try:
+            items = [{"expense_type": "FOOD", "good_or_service": f"Item {i}", "price": 10,
+                      "currency": currency, "date": "2025-01-10"}
+                     for i, currency in enumerate(["EUR", "EUR", "JPY", "USD", "EUR"])]
+            status, body = await post_json(server.port, items)
+            assert status == 201
+
+            status, body = await request(server.port, "GET", "/expenses")
+            return server.currency_rates.calls, sorted((row["good_or_service"], row["price"]) for row in body)
+        finally:
+            await server.stop()
+
+    calls, rows = asyncio.run(main())
+    assert sorted(calls) == [("EUR", "USD", "2025-01-10"), ("JPY", "USD", "2025-01-10")]
+    # A failed lookup keeps the original amount, as in the desktop app
+    assert rows == [("Item 0", 20.0), ("Item 1", 20.0), ("Item 2", 10.0), ("Item 3", 10.0), ("Item 4", 20.0)]